@@ -22,6 +22,18 @@ logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(level
 logger = logging.getLogger(__name__)
 
 class SongwritingAgentSystem:
+    # Single long-lived instance; slots avoid a per-instance __dict__
+    __slots__ = (
+        "function_map",
+        "router_agent",
+        "chord_progression_agent",
+        "lyrics_agent",
+        "melody_agent",
+        "drum_agent",
+        "user_proxy",
+        "specialist_function_map",
+    )
+
     def __init__(self):
         """Initialize the AutoGen-based songwriting agent system"""
         # Configure AutoGen for Azure OpenAI
@@ -303,45 +315,45 @@ class SongwritingAgentSystem:
             chord_result = generate_chord_progression(description, inspirations)
             
             if "error" in chord_result:
-                return Response(
+                return Response.model_construct(
                     result=f"Error generating chord progressions: {chord_result['error']}",
                     source="agent_error",
                     timestamp=datetime.now().isoformat()
                 )
             
             chords = chord_result["chords"]
-            logger.info(f"Generated chords: {chords}")
+            logger.info("Generated chords: %s", chords)
             
             # Step 2: Generate lyrics
             logger.info("Generating lyrics...")
             lyrics_result = generate_lyrics(description, inspirations, chords)
             
             if "error" in lyrics_result:
-                return Response(
+                return Response.model_construct(
                     result=f"Error generating lyrics: {lyrics_result['error']}",
                     source="agent_error",
                     timestamp=datetime.now().isoformat()
                 )
             
             lyrics = lyrics_result["lyrics"]
-            logger.info(f"Generated lyrics for verse and chorus")
+            logger.info("Generated lyrics for verse and chorus")
             
             # Step 3: Generate melody
             logger.info("Generating melody...")
             melody_result = generate_melody(description, inspirations, chords, lyrics)
             
             if "error" in melody_result:
-                return Response(
+                return Response.model_construct(
                     result=f"Error generating melody: {melody_result['error']}",
                     source="agent_error",
                     timestamp=datetime.now().isoformat()
                 )
             
             melody = melody_result["melody"]
-            logger.info(f"Generated melody for verse and chorus")
+            logger.info("Generated melody for verse and chorus")
             
             # Step 4: Generate drum pattern
-            logger.info(f"Generating drum pattern with style: {drum_style or 'auto-determined'}...")
+            logger.info("Generating drum pattern with style: %s...", drum_style or 'auto-determined')
             
             # If no drum style specified, determine it based on description and inspirations
             if not drum_style:
@@ -361,17 +373,17 @@ class SongwritingAgentSystem:
             )
             
             if "error" in drum_result:
-                logger.warning(f"Error generating drum pattern: {drum_result['error']}, continuing with basic pattern")
+                logger.warning("Error generating drum pattern: %s, continuing with basic pattern", drum_result['error'])
                 drum_style = "basic"
             else:
-                logger.info(f"Generated drum pattern with style: {drum_result.get('style', 'basic')}")
+                logger.info("Generated drum pattern with style: %s", drum_result.get('style', 'basic'))
                 drum_style = drum_result.get('style', 'basic')
             
             # Step 5: Generate MIDI file
             if not title:
                 title = f"Song about {description[:20]}"
             
-            logger.info(f"Generating MIDI file with title: {title}, tempo: {tempo}...")
+            logger.info("Generating MIDI file with title: %s, tempo: %s...", title, tempo)
             midi_path = MusicProcessor.generate_midi_file(chords, melody, title, tempo, drum_style)
             
             # Prepare result
@@ -390,7 +402,7 @@ class SongwritingAgentSystem:
                 "midi_file": midi_path
             }
             
-            return Response(
+            return Response.model_construct(
                 result=result,
                 source="songwriting_system",
                 timestamp=datetime.now().isoformat()
@@ -398,7 +410,7 @@ class SongwritingAgentSystem:
             
         except Exception as e:
             logger.error(f"Error in create_song: {str(e)}")
-            return Response(
+            return Response.model_construct(
                 result=f"Error creating song: {str(e)}",
                 source="agent_error",
                 timestamp=datetime.now().isoformat()
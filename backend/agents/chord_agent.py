@@ -150,7 +150,7 @@ def parse_chord_progression_response(response: str) -> Dict[str, List[str]]:
                 "chorus": chorus_chords
             }
     except Exception as e:
-        logger.warning(f"Regex extraction failed: {str(e)}")
+        logger.warning("Regex extraction failed: %s", e)
     
     # If all parsing attempts fail, return default progression
     logger.warning("All parsing attempts failed, using default chord progressions")
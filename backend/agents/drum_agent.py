@@ -52,7 +52,7 @@ def generate_drum_pattern(tempo: int = 120, style: str = "basic", bars: int = 8,
         # If style is not recognized, use AI to determine the most appropriate style
         if normalized_style not in AVAILABLE_STYLES:
             determined_style = _determine_style_with_ai(tempo, context)
-            logger.info(f"Style '{style}' not recognized, using AI-determined style: {determined_style}")
+            logger.info("Style '%s' not recognized, using AI-determined style: %s", style, determined_style)
             normalized_style = determined_style
         
         # Generate the drum pattern using the appropriate style
@@ -137,7 +137,7 @@ def _determine_style_with_ai(tempo: int, context: Optional[Dict[str, Any]]) -> s
                 return available_style
         
         # Default to basic if no match found
-        logger.warning(f"Could not determine style from AI response: '{style}', defaulting to 'basic'")
+        logger.warning("Could not determine style from AI response: '%s', defaulting to 'basic'", style)
         return "basic"
         
     except Exception as e:
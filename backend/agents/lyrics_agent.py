@@ -160,7 +160,7 @@ def parse_lyrics_response(response: str) -> Dict[str, str]:
                 "chorus": chorus_lyrics
             }
     except Exception as e:
-        logger.warning(f"Regex extraction failed: {str(e)}")
+        logger.warning("Regex extraction failed: %s", e)
     
     # If all parsing attempts fail, return default lyrics
     logger.warning("All parsing attempts failed, using default lyrics")
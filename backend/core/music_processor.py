@@ -2,10 +2,14 @@
 Music processor for MIDI generation and music theory operations
 """
 
+import io
 import os
 import json
+import hashlib
 import logging
+import threading
 from datetime import datetime
+from functools import lru_cache
 from fastapi import HTTPException
 
 import music21
@@ -14,11 +18,102 @@ from mido import Message, MidiFile, MidiTrack
 
 from config.settings import SONGS_DIR, TICKS_PER_BEAT, DEFAULT_TEMPO
 from utils.midi_utils import create_drum_pattern  # Import the shared implementation
+from utils.song_paths import safe_folder_name
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+def _write_file(path, data: bytes):
+    """Write a file in one pass, preallocating its full size where the OS supports it
+    
+    The data goes to a temporary file that then replaces path, so readers such as the
+    song index never see a partially written file.
+    """
+    tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        try:
+            if data and hasattr(os, "posix_fallocate"):
+                try:
+                    os.posix_fallocate(fd, 0, len(data))
+                except OSError:
+                    pass  # Not supported by this filesystem; the write below still works
+            view = memoryview(data)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+@lru_cache(maxsize=1024)
+def _melody_event(pitch, duration):
+    """Return (MIDI note number, or None for a rest, and duration in ticks) for a melody note
+    
+    Melodies reuse a handful of pitches and durations, so the music21 parsing is cached per pair.
+    """
+    m21_note = MusicProcessor.parse_melody_note({'pitch': pitch, 'duration': duration})
+    # Calculate duration in ticks (assuming 480 ticks per quarter note)
+    duration_ticks = int(TICKS_PER_BEAT * m21_note.duration.quarterLength)
+    if isinstance(m21_note, music21.note.Rest):
+        return None, duration_ticks
+    return m21_note.pitch.midi, duration_ticks
+
+@lru_cache(maxsize=512)
+def _voiced_chord(chord_name, voicing):
+    """Return the MIDI notes a chord is played with, cached per chord name and voicing"""
+    return tuple(voicing(MusicProcessor.parse_chord(chord_name)))
+
+@lru_cache(maxsize=64)
+def _chord_bar_template(progression, voicing, velocity, off_velocity, ticks_per_bar):
+    """Build the chord bar messages for a progression of (section, chord names) pairs
+    
+    Cached so a repeated progression is copied rather than rebuilt; the returned
+    messages are shared and must be copied before use.
+    """
+    messages = []
+    time = 0
+    for section, chord_list in progression:
+        # Resolve each chord once; the section repeats and the progressions recur across songs
+        voiced = []
+        for chord_name in chord_list:
+            try:
+                voiced.append(_voiced_chord(chord_name, voicing))
+            except TypeError:
+                # Unhashable chord names can't be cached; parse_chord falls back for them
+                voiced.append(_voiced_chord.__wrapped__(chord_name, voicing))
+        
+        # Play each section twice (8 bars total for each section)
+        for repetition in range(2):
+            for notes_to_play in voiced:
+                # Add note_on messages
+                for midi_note in notes_to_play:
+                    messages.append(Message('note_on', note=midi_note, velocity=velocity, time=time))
+                    time = 0  # Reset time for subsequent notes in chord
+                
+                # Set time for note_off - full bar
+                time = ticks_per_bar
+                
+                # Add note_off messages
+                for midi_note in notes_to_play:
+                    messages.append(Message('note_off', note=midi_note, velocity=off_velocity, time=time))
+                    time = 0  # Reset time for subsequent notes
+    return tuple(messages)
+
+def _full_voicing(chord):
+    """Voice a chord with all of its pitches (piano track)"""
+    return [note.midi for note in chord.pitches]
+
+def _pad_voicing(chord):
+    """Voice a chord with its root and fifth for a pad sound (strings track)"""
+    return [chord.root().midi, chord.getChordStep(5).midi]
+
 class MusicProcessor:
     @staticmethod
     def parse_chord(chord_name):
@@ -54,6 +149,44 @@ class MusicProcessor:
             # Fallback to a quarter note C
             return music21.note.Note('C4', type='quarter')
 
+    @staticmethod
+    def _append_chord_bars(track, chords, voicing, velocity, off_velocity, ticks_per_bar):
+        """Append one held chord per bar to a track, playing each section twice
+        
+        Args:
+            track: The MidiTrack to append to
+            chords: Dictionary with verse and chorus chord progressions
+            voicing: Function mapping a music21 chord to the MIDI notes to play
+            velocity: Note-on velocity
+            off_velocity: Note-off velocity
+            ticks_per_bar: Length of each chord in ticks
+        """
+        try:
+            progression = tuple((section, tuple(chord_list)) for section, chord_list in chords.items())
+            template = _chord_bar_template(progression, voicing, velocity, off_velocity, ticks_per_bar)
+        except TypeError:
+            # Unhashable chord names can't be cached; build the messages directly
+            template = _chord_bar_template.__wrapped__(chords.items(), voicing, velocity, off_velocity, ticks_per_bar)
+        track += [msg.copy() for msg in template]
+
+    @staticmethod
+    def _content_hash(chords, melody, title, tempo, drum_style):
+        """Hash the inputs that fully determine a generated song"""
+        payload = json.dumps(
+            {"chords": chords, "melody": melody, "title": title, "tempo": tempo, "drum_style": drum_style},
+            sort_keys=True
+        )
+        return hashlib.blake2b(payload.encode(), digest_size=8).hexdigest()
+
+    @staticmethod
+    def _stored_content_hash(info_path):
+        """Return the content hash recorded in an existing song_info.json, if any"""
+        try:
+            with open(info_path, 'r') as f:
+                return json.load(f).get("content_hash")
+        except (OSError, ValueError):
+            return None
+
     @staticmethod
     def generate_midi_file(chords, melody, title="Song", tempo=DEFAULT_TEMPO, drum_style="basic"):
         """Generate a MIDI file with piano, drums, strings, and lyrics annotation
@@ -69,6 +202,18 @@ class MusicProcessor:
             Path to the generated MIDI file
         """
         try:
+            # ASCII-only folder name, compatible with Latin-1 encoding (used by MIDI); shared with the song service
+            folder = safe_folder_name(title)
+            song_dir = os.path.join(SONGS_DIR, folder)
+            midi_path = os.path.join(song_dir, f"{folder}.mid")
+            info_path = os.path.join(song_dir, "song_info.json")
+            
+            # Skip rendering entirely if this exact song has already been generated
+            content_hash = MusicProcessor._content_hash(chords, melody, title, tempo, drum_style)
+            if MusicProcessor._stored_content_hash(info_path) == content_hash and os.path.exists(midi_path):
+                logger.info("Reusing existing MIDI file for %s", title)
+                return midi_path
+            
             # Create a MIDI file with tracks: tempo/time sig, piano (chords), melody, strings, drums
             mid = MidiFile(type=1)
             
@@ -92,30 +237,12 @@ class MusicProcessor:
             # Add chords - one chord per bar (1920 ticks)
             ticks_per_bar = TICKS_PER_BEAT * 4  # 4 beats per bar in 4/4 time
             
-            time = 0
             # Create a 16-bar pattern with verse and chorus sections
-            for section, chord_list in chords.items():
-                # Play each section twice (8 bars total for each section)
-                for repetition in range(2):
-                    for chord_name in chord_list:
-                        # Convert chord to music21 object
-                        chord = MusicProcessor.parse_chord(chord_name)
-                        
-                        # Add each note in the chord
-                        for note in chord.pitches:
-                            # Convert to MIDI note number
-                            midi_note = note.midi
-                            piano_track.append(Message('note_on', note=midi_note, velocity=64, time=time))
-                            time = 0  # Reset time for subsequent notes in chord
-                        
-                        # Set time for note_off - full bar
-                        time = ticks_per_bar
-                        
-                        # Add note_off messages
-                        for note in chord.pitches:
-                            midi_note = note.midi
-                            piano_track.append(Message('note_off', note=midi_note, velocity=64, time=time))
-                            time = 0  # Reset time for subsequent notes
+            MusicProcessor._append_chord_bars(
+                piano_track, chords,
+                voicing=_full_voicing,
+                velocity=64, off_velocity=64, ticks_per_bar=ticks_per_bar
+            )
             
             # Track 2: Melody with lyrics
             melody_track = MidiTrack()
@@ -127,24 +254,24 @@ class MusicProcessor:
             time = 0
             for section, notes in melody.items():
                 for note_info in notes:
-                    # Convert to music21 note or rest
-                    m21_note = MusicProcessor.parse_melody_note(note_info)
+                    # Convert to MIDI note number (None for a rest) and duration in ticks
+                    pitch = note_info.get('pitch', 'C4')
+                    duration = note_info.get('duration', 1.0)
+                    try:
+                        midi_note, duration_ticks = _melody_event(pitch, duration)
+                    except TypeError:
+                        # Unhashable values can't be cached; parse_melody_note falls back for them
+                        midi_note, duration_ticks = _melody_event.__wrapped__(pitch, duration)
                     
                     # Get the syllable for this note
                     syllable = note_info.get('syllable', '')
                     
-                    # Calculate duration in ticks (assuming 480 ticks per quarter note)
-                    duration_ticks = int(TICKS_PER_BEAT * m21_note.duration.quarterLength)
-                    
                     # Handle rest versus note differently
-                    if isinstance(m21_note, music21.note.Rest):
+                    if midi_note is None:
                         # For a rest, we just advance the time
                         time += duration_ticks
                     else:
                         # For a note, add note_on and note_off events
-                        # Convert to MIDI note number
-                        midi_note = m21_note.pitch.midi
-                        
                         # Add note_on
                         melody_track.append(Message('note_on', note=midi_note, velocity=80, time=time))
                         time = 0
@@ -166,59 +293,30 @@ class MusicProcessor:
             strings_track.append(Message('program_change', program=48, time=0))  # String Ensemble
             
             # Add basic string pad following the chord progression
-            time = 0
-            # Update strings track to use the same 16-bar pattern
-            for section, chord_list in chords.items():
-                # Play each section twice (8 bars total for each section)
-                for repetition in range(2):
-                    for chord_name in chord_list:
-                        # Convert chord to music21 object
-                        chord = MusicProcessor.parse_chord(chord_name)
-                        
-                        # Add root and fifth for a pad sound
-                        notes_to_play = [chord.root().midi, chord.getChordStep(5).midi]
-                        
-                        # Add note_on messages
-                        for midi_note in notes_to_play:
-                            strings_track.append(Message('note_on', note=midi_note, velocity=50, time=time))
-                            time = 0
-                        
-                        # Set time for note_off - full bar
-                        time = ticks_per_bar
-                        
-                        # Add note_off messages
-                        for midi_note in notes_to_play:
-                            strings_track.append(Message('note_off', note=midi_note, velocity=0, time=time))
-                            time = 0
+            MusicProcessor._append_chord_bars(
+                strings_track, chords,
+                voicing=_pad_voicing,
+                velocity=50, off_velocity=0, ticks_per_bar=ticks_per_bar
+            )
             
             # Create drum track with the specified style - now 16 bars to match the complete pattern
-            from utils.midi_utils import create_drum_pattern
             drum_track = create_drum_pattern(tempo, 16, drum_style)  # Create 16 bars of drums with the specified style
             mid.tracks.append(drum_track)
             
-            # Create a song directory structure
-            if not os.path.exists(SONGS_DIR):
-                os.makedirs(SONGS_DIR)
-            
-            # Normalize title to ensure it's compatible with Latin-1 encoding (used by MIDI)
-            normalized_title = title.encode('ascii', 'ignore').decode('ascii')
-            safe_title = "".join([c for c in normalized_title if c.isalpha() or c.isdigit() or c==' ']).rstrip()
-            if not safe_title:
-                safe_title = "song"
-                
-            song_dir = os.path.join(SONGS_DIR, safe_title.replace(' ', '_'))
+            # SONGS_DIR is created at startup; makedirs still fills in any missing parents
             if not os.path.exists(song_dir):
                 os.makedirs(song_dir)
             
-            midi_path = os.path.join(song_dir, f"{safe_title.replace(' ', '_')}.mid")
-            
             # Save the MIDI file
-            mid.save(midi_path)
+            midi_bytes = io.BytesIO()
+            mid.save(file=midi_bytes)
+            _write_file(midi_path, midi_bytes.getvalue())
             
             # Also save a song info JSON file with metadata
             song_info = {
                 "title": title,  # Keep the original title with special characters in JSON
                 "tempo": tempo,
+                "content_hash": content_hash,
                 "creation_date": datetime.now().isoformat(),
                 "chords": chords,
                 "drum_style": drum_style,
@@ -229,8 +327,12 @@ class MusicProcessor:
                 }
             }
             
-            with open(os.path.join(song_dir, "song_info.json"), "w") as f:
-                json.dump(song_info, f, indent=2)
+            # Sidecar with just the fields the song list needs, so listing songs skips the JSON parse.
+            # Written first: the song index rereads the sidecar when song_info.json's mtime changes.
+            summary = f"{title}\t{song_info['creation_date']}\n"
+            _write_file(os.path.join(song_dir, ".summary"), summary.encode())
+            
+            _write_file(info_path, json.dumps(song_info, indent=2).encode())
             
             return midi_path
         
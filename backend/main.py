@@ -10,11 +10,15 @@ This system provides:
 Uses Azure OpenAI for language model capabilities and AutoGen for the agent framework.
 """
 
+import os
+import json
+import time
 import logging
+from contextlib import asynccontextmanager
 from datetime import datetime
 from fastapi import FastAPI, HTTPException, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response as RawResponse
 
 from models.schemas import (
     SongRequest, ChordProgressionRequest, LyricsRequest, 
@@ -26,13 +30,20 @@ from agents.lyrics_agent import generate_lyrics
 from agents.melody_agent import generate_melody
 from agents.drum_agent import generate_drum_pattern
 from services.song_service import SongService
+from config.settings import SONGS_DIR
 
 # Setup logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Create the songs directory once at startup rather than on every request"""
+    os.makedirs(SONGS_DIR, exist_ok=True)
+    yield
+
 # Initialize FastAPI
-app = FastAPI(title="Songwriting Assistant API")
+app = FastAPI(title="Songwriting Assistant API", lifespan=lifespan)
 
 # Configure CORS for frontend access
 app.add_middleware(
@@ -50,13 +61,17 @@ songwriting_agent_system = SongwritingAgentSystem()
 @app.post("/api/create-song", response_model=Response)
 async def create_song(request: SongRequest):
     """Create a complete song based on description and inspirations"""
-    return await songwriting_agent_system.create_song(
+    response = await songwriting_agent_system.create_song(
         description=request.description,
         inspirations=request.inspirations,
         title=request.title,
         tempo=request.tempo or 120,
         drum_style=request.drum_style
     )
+    
+    # The new song folder should show up in the next song list
+    SongService.invalidate_index()
+    return response
 
 @app.post("/api/generate-chords", response_model=Response)
 async def generate_chords(request: ChordProgressionRequest):
@@ -67,7 +82,7 @@ async def generate_chords(request: ChordProgressionRequest):
         context=request.context
     )
     
-    return Response(
+    return Response.model_construct(
         result=result,
         source=result.get("source", "chord_generator"),
         timestamp=datetime.now().isoformat()
@@ -83,7 +98,7 @@ async def generate_lyrics_endpoint(request: LyricsRequest):
         context=request.context
     )
     
-    return Response(
+    return Response.model_construct(
         result=result,
         source=result.get("source", "lyrics_generator"),
         timestamp=datetime.now().isoformat()
@@ -100,7 +115,7 @@ async def generate_melody_endpoint(request: MelodyRequest):
         context=request.context
     )
     
-    return Response(
+    return Response.model_construct(
         result=result,
         source=result.get("source", "melody_generator"),
         timestamp=datetime.now().isoformat()
@@ -116,7 +131,7 @@ async def generate_drums_endpoint(request: DrumPatternRequest):
         context=request.context
     )
     
-    return Response(
+    return Response.model_construct(
         result=result,
         source=result.get("source", "drum_generator"),
         timestamp=datetime.now().isoformat()
@@ -149,10 +164,17 @@ def get_song_details(song_title: str):
     """Get details of a specific song"""
     return SongService.get_song_details(song_title)
 
-# Health check endpoint
+# Health check endpoint - the serialized body is rebuilt at most once per second
+_HEALTH_CACHE = (0, b"")
+
 @app.get("/health")
 def health_check():
-    return {"status": "healthy", "timestamp": datetime.now().isoformat()}
+    global _HEALTH_CACHE
+    now = int(time.time())
+    if now != _HEALTH_CACHE[0]:
+        body = {"status": "healthy", "timestamp": datetime.fromtimestamp(now).isoformat()}
+        _HEALTH_CACHE = (now, json.dumps(body, separators=(",", ":")).encode())
+    return RawResponse(content=_HEALTH_CACHE[1], media_type="application/json")
 
 if __name__ == "__main__":
     import uvicorn
@@ -3,119 +3,227 @@ Song creation and management service
 """
 
 import os
-import json
+import time
 import logging
-from typing import List, Dict, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import List, Dict, Optional, Tuple
+import orjson
 from fastapi import HTTPException
 
 from models.schemas import SongDetails
 from config.settings import SONGS_DIR
+from utils.song_paths import safe_folder_name
 
-# Setup logging
-logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+# Logging is configured by the application entry point
 logger = logging.getLogger(__name__)
 
+# Song paths are built by concatenation rather than os.path.join on every request
+_SEP = os.sep
+_SONGS_ROOT = SONGS_DIR.rstrip(_SEP) + _SEP
+
+@lru_cache(maxsize=1024)
+def _load_song_info(info_path: str, mtime_ns: int) -> Dict:
+    """Parse a song_info.json file, cached until its modification time changes
+    
+    The returned dict is shared between callers and must not be modified.
+    """
+    with open(info_path, 'rb') as f:
+        return orjson.loads(f.read())
+
+def _song_summary(song_dir: str, song_folder: str) -> Dict:
+    """Build the song list entry for one song folder"""
+    # Prefer the title<TAB>creation_date sidecar written alongside the MIDI file
+    try:
+        with open(f"{song_dir}{_SEP}.summary", 'rb') as f:
+            title, creation_date = f.read().rstrip(b'\n').rsplit(b'\t', 1)
+        return {
+            "title": title.decode(),
+            "creation_date": creation_date.decode(),
+            "folder": song_folder
+        }
+    except (OSError, ValueError):
+        pass  # Songs generated before the sidecar existed only have song_info.json
+    
+    # Try to read song_info.json; the stat for the cache key doubles as the existence check
+    info_path = f"{song_dir}{_SEP}song_info.json"
+    try:
+        song_info = _load_song_info(info_path, os.stat(info_path).st_mtime_ns)
+        return {
+            "title": song_info.get("title", song_folder.replace('_', ' ')),
+            "creation_date": song_info.get("creation_date", ""),
+            "folder": song_folder
+        }
+    except (OSError, orjson.JSONDecodeError, AttributeError):
+        # If there is no song_info.json or it can't be read or parsed as an object, just use the folder name
+        return {
+            "title": song_folder.replace('_', ' '),
+            "folder": song_folder
+        }
+
+@lru_cache(maxsize=512)
+def _song_details_cached(folder: str, mtime_ns: int, song_title: str) -> SongDetails:
+    """Build a song's details from its song_info.json, cached until the file changes
+    
+    The returned model is shared between requests and must not be modified.
+    """
+    song_dir = _SONGS_ROOT + folder
+    song_info = _load_song_info(f"{song_dir}{_SEP}song_info.json", mtime_ns)
+    # Add the path to the MIDI file
+    midi_file = f"{song_dir}{_SEP}{folder}.mid"
+    return SongDetails.model_construct(
+        title=song_info.get("title", song_title),
+        description=song_info.get("description", None),
+        inspirations=song_info.get("inspirations", None),
+        tempo=song_info.get("tempo", None),
+        chords=song_info.get("chords", None),
+        lyrics=song_info.get("lyrics", None),
+        melody_summary=song_info.get("melody_info", None),
+        midi_file=midi_file,
+        creation_date=song_info.get("creation_date", None)
+    )
+
+# Song metadata reads are I/O bound, so a thread pool hides per-file latency on slow filesystems
+_READ_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="song-info")
+
+def _info_mtime(song_dir: str) -> Optional[int]:
+    """Return the mtime of a song folder's song_info.json, or None if it has none"""
+    try:
+        return os.stat(f"{song_dir}{_SEP}song_info.json").st_mtime_ns
+    except OSError:
+        return None
+
+class SongIndex:
+    """In-memory index of the songs directory shared by the song list and song details lookups
+    
+    The directory is rescanned at most once every refresh_interval_s seconds, and only songs whose
+    song_info.json changed since the previous scan are read again.
+    """
+
+    def __init__(self, songs_dir: str, refresh_interval_s: float = 2.0):
+        self.songs_dir = songs_dir
+        self.refresh_interval_s = refresh_interval_s
+        # folder -> (song_info.json mtime_ns or None, song list entry), in directory order
+        self._by_folder: Dict[str, Tuple[Optional[int], Dict]] = {}
+        self._refreshed_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def refresh(self):
+        """Rescan the songs directory"""
+        with self._lock:
+            # SONGS_DIR is created at startup, so a missing directory is only expected before then
+            try:
+                with os.scandir(self.songs_dir) as entries:
+                    # DirEntry.is_dir() reuses the file type from the directory listing instead of another stat
+                    folders = [entry for entry in entries if entry.is_dir()]
+            except FileNotFoundError:
+                folders = []
+            
+            # Stat and read concurrently; map() keeps the directory order
+            old = self._by_folder
+            mtimes = list(_READ_POOL.map(_info_mtime, [entry.path for entry in folders]))
+            changed = [entry for entry, mtime in zip(folders, mtimes)
+                       if entry.name not in old or old[entry.name][0] != mtime]
+            changed_names = [entry.name for entry in changed]
+            changed_paths = [entry.path for entry in changed]
+            summaries = dict(zip(changed_names, _READ_POOL.map(_song_summary, changed_paths, changed_names)))
+            
+            self._by_folder = {
+                entry.name: (mtime, summaries[entry.name]) if entry.name in summaries else old[entry.name]
+                for entry, mtime in zip(folders, mtimes)
+            }
+            self._refreshed_at = time.monotonic()
+
+    def invalidate(self):
+        """Force a rescan on the next lookup, e.g. after a song has been created"""
+        self._refreshed_at = None
+
+    def _refresh_if_stale(self):
+        if self._refreshed_at is None or time.monotonic() - self._refreshed_at >= self.refresh_interval_s:
+            self.refresh()
+
+    def songs(self) -> List[Dict]:
+        """Return the song list entries in directory order"""
+        self._refresh_if_stale()
+        return [summary for _, summary in self._by_folder.values()]
+
+    def lookup(self, folder: str) -> Optional[Tuple[Optional[int], Dict]]:
+        """Return (song_info.json mtime_ns, song list entry) for a folder, or None if there is no such song"""
+        self._refresh_if_stale()
+        indexed = self._by_folder.get(folder)
+        if indexed is None:
+            # The song may have been created since the last scan; check just its folder rather than rescanning
+            song_dir = f"{self.songs_dir.rstrip(_SEP)}{_SEP}{folder}"
+            if not os.path.isdir(song_dir):
+                return None
+            indexed = (_info_mtime(song_dir), _song_summary(song_dir, folder))
+            with self._lock:
+                # Replace rather than update the dict, since songs() iterates it without the lock
+                self._by_folder = {**self._by_folder, folder: indexed}
+        return indexed
+
+song_index = SongIndex(SONGS_DIR)
+
 class SongService:
     @staticmethod
     def list_songs() -> List[Dict]:
         """List all generated songs"""
         try:
-            if not os.path.exists(SONGS_DIR):
-                return []
-            
-            songs = []
-            for song_folder in os.listdir(SONGS_DIR):
-                folder_path = os.path.join(SONGS_DIR, song_folder)
-                if os.path.isdir(folder_path):
-                    # Try to read song_info.json if it exists
-                    info_path = os.path.join(folder_path, "song_info.json")
-                    if os.path.exists(info_path):
-                        try:
-                            with open(info_path, 'r') as f:
-                                song_info = json.load(f)
-                                songs.append({
-                                    "title": song_info.get("title", song_folder.replace('_', ' ')),
-                                    "creation_date": song_info.get("creation_date", ""),
-                                    "folder": song_folder
-                                })
-                        except:
-                            # If JSON can't be read, just use the folder name
-                            songs.append({
-                                "title": song_folder.replace('_', ' '),
-                                "folder": song_folder
-                            })
-                    else:
-                        # No song_info.json, just use the folder name
-                        songs.append({
-                            "title": song_folder.replace('_', ' '),
-                            "folder": song_folder
-                        })
-            
-            return songs
+            return song_index.songs()
         except Exception as e:
-            logger.error(f"Error listing songs: {str(e)}")
+            logger.exception("Error listing songs")
             raise HTTPException(status_code=500, detail=f"Error listing songs: {str(e)}")
 
+    @staticmethod
+    def invalidate_index():
+        """Make the next song lookup rescan the songs directory"""
+        song_index.invalidate()
+
     @staticmethod
     def get_song_details(song_title: str) -> SongDetails:
         """Get details of a specific song"""
         try:
-            safe_title = "".join([c for c in song_title if c.isalpha() or c.isdigit() or c==' ']).rstrip()
-            if not safe_title:
-                safe_title = "song"
-                
-            song_dir = os.path.join(SONGS_DIR, safe_title.replace(' ', '_'))
-            
-            if not os.path.exists(song_dir):
+            folder = safe_folder_name(song_title)
+            indexed = song_index.lookup(folder)
+            if indexed is None:
                 raise HTTPException(status_code=404, detail=f"Song '{song_title}' not found")
-                
-            # Read song_info.json if it exists
-            info_path = os.path.join(song_dir, "song_info.json")
-            if os.path.exists(info_path):
-                with open(info_path, 'r') as f:
-                    song_info = json.load(f)
-                    # Add the path to the MIDI file
-                    midi_file = os.path.join(song_dir, f"{safe_title.replace(' ', '_')}.mid")
-                    return SongDetails(
-                        title=song_info.get("title", song_title),
-                        description=song_info.get("description", None),
-                        inspirations=song_info.get("inspirations", None),
-                        tempo=song_info.get("tempo", None),
-                        chords=song_info.get("chords", None),
-                        lyrics=song_info.get("lyrics", None),
-                        melody_summary=song_info.get("melody_info", None),
-                        midi_file=midi_file,
-                        creation_date=song_info.get("creation_date", None)
-                    )
-            else:
-                # Basic info if no JSON file
-                midi_file = os.path.join(song_dir, f"{safe_title.replace(' ', '_')}.mid")
-                return SongDetails(
-                    title=song_title,
-                    midi_file=midi_file
-                )
+            
+            mtime_ns = indexed[0]
+            if mtime_ns is not None:
+                try:
+                    return _song_details_cached(folder, mtime_ns, song_title)
+                except FileNotFoundError:
+                    # Deleted since the last scan; rescan on the next lookup
+                    song_index.invalidate()
+                    if not os.path.isdir(_SONGS_ROOT + folder):
+                        raise HTTPException(status_code=404, detail=f"Song '{song_title}' not found")
+            
+            # Basic info if no JSON file
+            return SongDetails.model_construct(
+                title=song_title,
+                midi_file=f"{_SONGS_ROOT}{folder}{_SEP}{folder}.mid"
+            )
         except HTTPException:
             raise
         except Exception as e:
-            logger.error(f"Error getting song details: {str(e)}")
+            logger.exception("Error getting song details")
             raise HTTPException(status_code=500, detail=f"Error getting song details: {str(e)}")
 
     @staticmethod
     def get_midi_path(song_title: str) -> str:
         """Get the path to a song's MIDI file"""
         try:
-            safe_title = "".join([c for c in song_title if c.isalpha() or c.isdigit() or c==' ']).rstrip()
-            if not safe_title:
-                safe_title = "song"
-                
-            # Path to the song's directory and MIDI file
-            song_dir = os.path.join(SONGS_DIR, safe_title.replace(' ', '_'))
-            midi_path = os.path.join(song_dir, f"{safe_title.replace(' ', '_')}.mid")
+            # Path to the song's MIDI file
+            folder = safe_folder_name(song_title)
+            midi_path = f"{_SONGS_ROOT}{folder}{_SEP}{folder}.mid"
             
-            if not os.path.exists(midi_path):
+            if not os.access(midi_path, os.F_OK):
                 raise HTTPException(status_code=404, detail=f"MIDI file for '{song_title}' not found")
             
             return midi_path
+        except HTTPException:
+            raise
         except Exception as e:
-            logger.error(f"Error getting MIDI path: {str(e)}")
+            logger.exception("Error getting MIDI path")
             raise HTTPException(status_code=500, detail=f"Error getting MIDI path: {str(e)}")
\ No newline at end of file
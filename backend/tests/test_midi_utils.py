@@ -0,0 +1,85 @@
+"""
+Regression tests for the drum track writer in utils.midi_utils
+"""
+
+import random
+import unittest
+from unittest import mock
+
+from mido import Message
+
+from utils import midi_utils
+from utils.midi_utils import DRUM_NOTES, VELOCITIES, create_drum_pattern
+
+TICKS_PER_BAR = midi_utils.TICKS_PER_BEAT * 4
+
+def _reference_messages(single_bar_events, bars):
+    """The original per-bar drum writer, kept as the reference for the vectorized one"""
+    messages = []
+    single_bar_events = sorted(single_bar_events, key=lambda x: x[0])
+    for bar in range(bars):
+        last_event_time = 0
+        if bar == 0:
+            messages.append(Message('note_on', note=DRUM_NOTES["crash"], velocity=VELOCITIES["accent"], channel=9, time=0))
+            messages.append(Message('note_off', note=DRUM_NOTES["crash"], velocity=0, channel=9, time=10))
+            last_event_time = 10
+        for event_idx, (tick, note, velocity, duration) in enumerate(single_bar_events):
+            if event_idx == 0 and bar == 0:
+                time_param = max(0, tick - last_event_time)
+            else:
+                time_param = tick - last_event_time if tick > last_event_time else 0
+            messages.append(Message('note_on', note=note, velocity=velocity, channel=9, time=time_param))
+            messages.append(Message('note_off', note=note, velocity=0, channel=9, time=duration))
+            last_event_time = tick + duration
+        if bar < bars - 1:
+            remaining_time = TICKS_PER_BAR - last_event_time
+            if remaining_time > 0:
+                messages.append(Message('note_on', note=DRUM_NOTES["kick"], velocity=0, channel=9, time=remaining_time))
+                messages.append(Message('note_off', note=DRUM_NOTES["kick"], velocity=0, channel=9, time=0))
+    return messages
+
+class DrumPatternTest(unittest.TestCase):
+    BARS = (1, 2, 16)
+
+    def assertMatchesReference(self, style, pattern, bars):
+        # The first two messages are the track name and program change
+        track = create_drum_pattern(120, bars, style)
+        self.assertEqual([str(msg) for msg in track[2:]],
+                         [str(msg) for msg in _reference_messages(pattern, bars)],
+                         f"style={style} bars={bars}")
+
+    def test_all_styles_match_reference(self):
+        for style, builder in midi_utils._PATTERN_FUNCTIONS.items():
+            for seed in range(40):
+                if style in midi_utils._DETERMINISTIC_STYLES:
+                    pattern = list(builder(TICKS_PER_BAR))
+                else:
+                    pattern = builder(TICKS_PER_BAR, random.Random(seed))
+                # Stub the builder so the writer sees exactly this pattern
+                with mock.patch.dict(midi_utils._PATTERN_FUNCTIONS, {style: lambda ticks_per_bar, *args, p=pattern: list(p)}):
+                    for bars in self.BARS:
+                        with self.subTest(style=style, seed=seed, bars=bars):
+                            self.assertMatchesReference(style, pattern, bars)
+                if style in midi_utils._DETERMINISTIC_STYLES:
+                    break  # Same pattern for every seed
+
+    def test_fill_past_bar_line_stays_in_its_bar(self):
+        # The rock tom fill can land exactly on ticks_per_bar
+        pattern = [(0, 36, 100, 40), (1680, 45, 90, 40), (1800, 47, 90, 40), (TICKS_PER_BAR, 48, 90, 40)]
+        with mock.patch.dict(midi_utils._PATTERN_FUNCTIONS, {"rock": lambda ticks_per_bar, *args: list(pattern)}):
+            for bars in (1, 2, 3, 16):
+                with self.subTest(bars=bars):
+                    self.assertMatchesReference("rock", pattern, bars)
+
+    def test_empty_pattern(self):
+        with mock.patch.dict(midi_utils._PATTERN_FUNCTIONS, {"trap": lambda ticks_per_bar, *args: []}):
+            for bars in (0, 1, 2, 3):
+                with self.subTest(bars=bars):
+                    self.assertMatchesReference("trap", [], bars)
+
+    def test_rock_seeds_do_not_fail(self):
+        for seed in range(200):
+            create_drum_pattern(120, 16, "rock", seed=seed)
+
+if __name__ == "__main__":
+    unittest.main()
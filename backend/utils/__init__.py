@@ -1,3 +1,24 @@
 """Utility functions for music processing"""
-from utils.music_theory import syllabify
-from utils.midi_utils import create_drum_pattern
\ No newline at end of file
+import importlib
+
+__all__ = ['syllabify', 'create_drum_pattern', 'create_drum_patterns_batch', 'generate_drum_events', 'safe_folder_name']
+
+# Submodules are imported on first access (PEP 562) so importing one utility doesn't load the others
+_LAZY_ATTRS = {
+    'syllabify': 'utils.music_theory',
+    'create_drum_pattern': 'utils.midi_utils',
+    'create_drum_patterns_batch': 'utils.midi_utils',
+    'generate_drum_events': 'utils.midi_utils',
+    'safe_folder_name': 'utils.song_paths',
+}
+
+def __getattr__(name):
+    module_name = _LAZY_ATTRS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
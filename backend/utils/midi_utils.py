@@ -2,11 +2,17 @@
 MIDI utility functions for music processing with enhanced drum pattern capabilities
 """
 
+import os
+import zlib
 import logging
 import mido
 from mido import Message, MidiTrack, MidiFile
+import numpy as np
 import random
-from typing import Dict, List, Tuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
 
 from config.settings import TICKS_PER_BEAT
 
@@ -47,13 +53,103 @@ VELOCITIES = {
     "ghost": 40,
 }
 
-def create_drum_pattern(tempo: int = 120, bars: int = 8, style: str = "basic") -> MidiTrack:
+# Step-sequencer rows for the fixed 4/4 styles: one 16-bit mask per
+# (instrument, velocity), one bit per sixteenth note, most significant bit first,
+# so 0b1000_1000_1000_1000 hits on every beat. Rows sharing a tick play in table order.
+PATTERNS_44 = {
+    "basic": (
+        ("kick", "accent", 0b1000_0000_0010_0000),
+        ("closed_hihat", "normal", 0b0010_0010_1000_0010),
+        ("snare", "accent", 0b0000_1000_0000_1000),
+    ),
+    "four_on_floor": (
+        ("kick", "accent", 0b1000_1000_1000_1000),
+        ("snare", "normal", 0b0000_1000_0000_1000),
+        ("open_hihat", "soft", 0b0010_0010_0010_0010),
+        ("closed_hihat", "normal", 0b1000_1000_1000_1000),
+        ("closed_hihat", "soft", 0b0111_0111_0111_0111),
+    ),
+    "latin": (
+        ("clave", "accent", 0b1000_1000_1010_0010),  # 3-2 clave
+        ("percussion_low", "accent", 0b1000_0000_1000_0000),
+        ("percussion_high", "normal", 0b0010_0000_0010_0000),
+        ("percussion_mid", "normal", 0b0000_1000_0000_1000),
+        ("percussion_high", "soft", 0b0000_0010_0000_0010),
+        ("shaker", "normal", 0b1000_1000_1000_1000),
+        ("shaker", "soft", 0b0010_0010_0010_0010),
+        ("cowbell", "normal", 0b0000_1000_0000_1000),
+        ("kick", "normal", 0b1000_0000_0010_0000),
+        ("snare", "normal", 0b0000_1000_0000_1000),
+    ),
+}
+
+# Note lengths in ticks, shared by all the pattern builders
+_Q = TICKS_PER_BEAT  # Quarter note
+_E = _Q // 2         # Eighth note
+_S = _Q // 4         # Sixteenth note
+_TR = _Q // 3        # Eighth-note triplet, the basis of a swing feel
+
+EIGHTH_NOTE_STEPS = 0b1010_1010_1010_1010
+
+# Coin-flip thresholds out of 256 for _CoinFlips.chance
+_P50 = 128  # 50% chance
+_P40 = 102  # 40% chance
+_P30 = 77   # 30% chance
+
+class _CoinFlips:
+    """Random variation for the pattern builders, served from batches of getrandbits
+    
+    Every decision consumes one byte, so a single getrandbits call covers 32 of them.
+    rng is the random module itself or a random.Random instance.
+    """
+    __slots__ = ("_getrandbits", "_bits", "_left")
+
+    def __init__(self, rng=random):
+        self._getrandbits = rng.getrandbits
+        self._bits = 0
+        self._left = 0
+
+    def _byte(self) -> int:
+        if not self._left:
+            self._bits = self._getrandbits(256)
+            self._left = 32
+        byte = self._bits & 0xFF
+        self._bits >>= 8
+        self._left -= 1
+        return byte
+
+    def chance(self, threshold: int) -> bool:
+        """Return True with probability threshold/256"""
+        return self._byte() < threshold
+
+    def choice(self, options):
+        """Pick one of a short sequence of options"""
+        return options[self._byte() % len(options)]
+
+def _mask_ticks(mask: int) -> List[int]:
+    """Return the tick positions of the steps set in a 16-step mask"""
+    steps = np.unpackbits(np.array([mask >> 8, mask & 0xFF], dtype=np.uint8))
+    return (np.nonzero(steps)[0] * _S).tolist()
+
+def _expand_step_rows(rows, note_duration: int = 40) -> Tuple[Tuple[int, int, int, int], ...]:
+    """Expand (instrument, velocity, mask) rows into sorted (tick, note, velocity, duration) tuples"""
+    pattern = []
+    for instrument, velocity, mask in rows:
+        for tick in _mask_ticks(mask):
+            pattern.append((tick, DRUM_NOTES[instrument], VELOCITIES[velocity], note_duration))
+    
+    # Stable sort keeps the table order for hits that share a tick
+    pattern.sort(key=itemgetter(0))
+    return tuple(pattern)
+
+def create_drum_pattern(tempo: int = 120, bars: int = 8, style: str = "basic", seed: Optional[int] = None) -> MidiTrack:
     """Create a drum track with the specified style and number of bars
     
     Parameters:
         tempo (int): The tempo in BPM
         bars (int): The number of bars to generate
         style (str): The style of drum pattern to generate
+        seed (int, optional): Seed for the pattern's random variation; uses the global random state if omitted
         
     Returns:
         MidiTrack: A MIDI track containing the drum pattern
@@ -62,176 +158,222 @@ def create_drum_pattern(tempo: int = 120, bars: int = 8, style: str = "basic") -
     drum_track.append(mido.MetaMessage('track_name', name=f'Drums ({style})', time=0))
     drum_track.append(Message('program_change', program=0, channel=9, time=0))  # Drums channel (9)
     
-    # Calculate total ticks per bar to ensure consistent bar length
-    ticks_per_bar = TICKS_PER_BEAT * 4  # 4 beats per bar in 4/4 time
-    
-    # Generate pattern based on style
-    pattern_function = {
-        "basic": _create_basic_pattern,
-        "four_on_floor": _create_four_on_floor_pattern,
-        "trap": _create_trap_pattern,
-        "latin": _create_latin_pattern,
-        "pop": _create_pop_pattern,
-        "rock": _create_rock_pattern,
-        "jazz": _create_jazz_pattern,
-        "electronic": _create_electronic_pattern,
-        "hip_hop": _create_hip_hop_pattern,
-        "r_and_b": _create_rnb_pattern,
-    }.get(style, _create_basic_pattern)  # Default to basic if style not found
-    
-    # Get the pattern for a single bar
-    single_bar_events = pattern_function(ticks_per_bar)
-    
-    # Sort the events by tick position to ensure proper sequencing
-    single_bar_events = sorted(single_bar_events, key=lambda x: x[0])
-    
-    # Create the drum track for the specified number of bars
-    for bar in range(bars):
-        # For each bar, we'll track the absolute tick position within the MIDI file
-        absolute_tick = bar * ticks_per_bar
-        
-        # For each new bar, we need to reset the "last event time" for proper MIDI timing
-        last_event_time = 0
-        
-        # Add a crash cymbal on the first beat of the first bar
-        if bar == 0:
-            drum_track.append(Message('note_on', note=DRUM_NOTES["crash"], velocity=VELOCITIES["accent"], channel=9, time=0))
-            # Short duration for crash - we don't want to delay other notes
-            drum_track.append(Message('note_off', note=DRUM_NOTES["crash"], velocity=0, channel=9, time=10))
-            last_event_time = 10  # Update last_event_time for proper sequencing
-        
-        # Process all events in the pattern
-        for event_idx, (tick, note, velocity, duration) in enumerate(single_bar_events):
-            # Calculate absolute tick position for this event
-            event_absolute_tick = absolute_tick + tick
-            
-            # Calculate the time parameter (delta time since last event)
-            if event_idx == 0 and bar == 0:
-                # For the first note of the first bar, time is relative to the crash cymbal
-                time_param = max(0, tick - last_event_time)
-            else:
-                # Calculate delta time from the last event
-                time_param = tick - last_event_time if tick > last_event_time else 0
-            
-            # Add the note_on event
-            drum_track.append(Message('note_on', note=note, velocity=velocity, channel=9, time=time_param))
-            
-            # Add the note_off event with the specified duration
-            drum_track.append(Message('note_off', note=note, velocity=0, channel=9, time=duration))
-            
-            # Update the timing tracker - note that we've now advanced to tick + duration
-            last_event_time = tick + duration
-        
-        # Make sure we end exactly at the bar boundary
-        if bar < bars - 1:  # Don't add extra time after the last bar
-            remaining_time = ticks_per_bar - last_event_time
-            if remaining_time > 0:
-                # Add a silent note to complete the bar
-                drum_track.append(Message('note_on', note=DRUM_NOTES["kick"], velocity=0, channel=9, time=remaining_time))
-                drum_track.append(Message('note_off', note=DRUM_NOTES["kick"], velocity=0, channel=9, time=0))
+    # Default to basic if style not found
+    pattern_style = style if style in _PATTERN_FUNCTIONS else "basic"
+    
+    if pattern_style in _DETERMINISTIC_STYLES:
+        # Fixed patterns repeat the same bar, so copy the bars from the cached per-style templates
+        only_bar, first_bar, middle_bar, last_bar = _drum_bar_templates(pattern_style)
+        if bars == 1:
+            messages = only_bar
+        elif bars > 1:
+            messages = first_bar + middle_bar * (bars - 2) + last_bar
+        else:
+            messages = ()
+        drum_track += [msg.copy() for msg in messages]
+    else:
+        rng = random.Random(seed) if seed is not None else random
+        single_bar = _single_bar_events(pattern_style, rng)
+        drum_track += _drum_messages(single_bar, bars, TICKS_PER_BEAT * 4)
     
     return drum_track
 
-def _create_basic_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
-    """Create a basic rock/pop drum pattern
+def create_drum_patterns_batch(specs: List[Dict]) -> List[MidiTrack]:
+    """Create several drum tracks in parallel worker processes
     
-    Returns a list of (tick, note, velocity, duration) tuples
+    Parameters:
+        specs (List[Dict]): create_drum_pattern keyword arguments (tempo, bars, style) for each track
+        
+    Returns:
+        List[MidiTrack]: The drum tracks, in the same order as specs. Specs without a seed
+        get one derived from the spec, so the same spec always gives the same track.
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    sixteenth = quarter // 4
-    note_duration = 40  # Short duration for percussion sounds
-    
-    # Pattern: kick, hihat, snare, hihat, hihat, kick, snare, hihat
-    pattern = [
-        # tick, note, velocity, duration
-        (0, DRUM_NOTES["kick"], VELOCITIES["accent"], note_duration),
-        (eighth, DRUM_NOTES["closed_hihat"], VELOCITIES["normal"], note_duration),
-        (quarter, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration),
-        (quarter + eighth, DRUM_NOTES["closed_hihat"], VELOCITIES["normal"], note_duration),
-        (quarter * 2, DRUM_NOTES["closed_hihat"], VELOCITIES["normal"], note_duration),
-        (quarter * 2 + eighth, DRUM_NOTES["kick"], VELOCITIES["accent"], note_duration),
-        (quarter * 3, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration),
-        (quarter * 3 + eighth, DRUM_NOTES["closed_hihat"], VELOCITIES["normal"], note_duration),
-    ]
+    if not specs:
+        return []
     
-    # Add hihat for every eighth note (underneath the existing pattern)
-    hihat_pattern = []
-    for i in range(0, ticks_per_bar, eighth):
-        hihat_pattern.append((i, DRUM_NOTES["closed_hihat"], VELOCITIES["soft"], note_duration))
-    
-    # Merge hihat pattern with main pattern, avoiding duplicates
-    main_ticks = [item[0] for item in pattern]
-    full_pattern = pattern + [item for item in hihat_pattern if item[0] not in main_ticks]
-    
-    # Sort by tick position
-    return sorted(full_pattern, key=lambda x: x[0])
+    with ProcessPoolExecutor(max_workers=min(len(specs), os.cpu_count() or 1)) as executor:
+        return list(executor.map(_create_seeded_drum_pattern, specs))
 
-def _create_four_on_floor_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
-    """Create a four-on-the-floor pattern (disco, house)
+def _create_seeded_drum_pattern(spec: Dict) -> MidiTrack:
+    """Create one drum track for create_drum_patterns_batch, seeding it from the spec if needed"""
+    if spec.get("seed") is None:
+        spec = {**spec, "seed": zlib.crc32(repr(sorted(spec.items())).encode())}
+    return create_drum_pattern(**spec)
+
+def generate_drum_events(tempo: int = 120, bars: int = 8, style: str = "basic", rng=random) -> np.ndarray:
+    """Generate the drum hits for the specified style and number of bars
     
-    Returns a list of (tick, note, velocity, duration) tuples
+    Parameters:
+        tempo (int): The tempo in BPM
+        bars (int): The number of bars to generate
+        style (str): The style of drum pattern to generate
+        rng: Source of the pattern's random variation, the random module or a random.Random
+        
+    Returns:
+        np.ndarray: An (N, 4) int32 array of [tick, note, velocity, duration] rows in
+        absolute ticks, starting with a crash on the first beat. Fills may run past their
+        bar line, so a row's bar can't always be recovered from its tick.
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    sixteenth = quarter // 4
-    note_duration = 40  # Short duration for percussion sounds
+    # Calculate total ticks per bar to ensure consistent bar length
+    ticks_per_bar = TICKS_PER_BEAT * 4  # 4 beats per bar in 4/4 time
+    if bars < 1:
+        return np.empty((0, 4), dtype=np.int32)
     
-    # Basic pattern: kick on every beat, snare on 2 and 4, open hihat on offbeats
-    pattern = []
+    # Default to basic if style not found
+    pattern_style = style if style in _PATTERN_FUNCTIONS else "basic"
+    single_bar = _single_bar_events(pattern_style, rng)
     
-    # Kick on every beat (1, 2, 3, 4)
-    for beat in range(4):
-        pattern.append((beat * quarter, DRUM_NOTES["kick"], VELOCITIES["accent"], note_duration))
+    # Repeat the bar, shifting each copy to its bar's start
+    events = np.tile(single_bar, (bars, 1))
+    events[:, 0] += np.repeat(np.arange(bars, dtype=np.int32) * ticks_per_bar, len(single_bar))
     
-    # Snare on beats 2 and 4
-    pattern.append((quarter, DRUM_NOTES["snare"], VELOCITIES["normal"], note_duration))
-    pattern.append((3 * quarter, DRUM_NOTES["snare"], VELOCITIES["normal"], note_duration))
+    # Add a crash cymbal on the first beat, ahead of everything else on that tick
+    crash = [[0, DRUM_NOTES["crash"], VELOCITIES["accent"], 10]]  # Short so it doesn't delay other notes
+    return np.concatenate((np.array(crash, dtype=np.int32), events))
+
+def _single_bar_events(style: str, rng=random) -> np.ndarray:
+    """Build one bar of a style's pattern as a (K, 4) int32 array of [tick, note, velocity, duration]
+    rows relative to the bar start, sorted by tick; stable so hits sharing a tick keep their order"""
+    ticks_per_bar = TICKS_PER_BEAT * 4  # 4 beats per bar in 4/4 time
+    if style in _DETERMINISTIC_STYLES:
+        pattern = _PATTERN_FUNCTIONS[style](ticks_per_bar)
+    else:
+        pattern = _PATTERN_FUNCTIONS[style](ticks_per_bar, rng)
+    single_bar = np.array(pattern, dtype=np.int32).reshape(-1, 4)
+    return single_bar[np.argsort(single_bar[:, 0], kind='stable')]
+
+@lru_cache(maxsize=8)
+def _drum_bar_templates(style: str) -> Tuple[Tuple[Message, ...], ...]:
+    """Build the drum messages for a deterministic style, split into reusable bars
     
-    # Open hi-hat on offbeats
-    for i in range(4):
-        pattern.append((i * quarter + eighth, DRUM_NOTES["open_hihat"], VELOCITIES["soft"], note_duration))
+    Returns (only, first, middle, last): the messages of a one-bar track, and of the first
+    (with the crash), each middle and the final bar of a longer track. Only bars before the
+    last are padded to the bar line, and the middle bars are all identical.
+    """
+    ticks_per_bar = TICKS_PER_BEAT * 4  # 4 beats per bar in 4/4 time
+    single_bar = _single_bar_events(style)
+    only = tuple(_drum_messages(single_bar, 1, ticks_per_bar))
+    two = tuple(_drum_messages(single_bar, 2, ticks_per_bar))
+    three = tuple(_drum_messages(single_bar, 3, ticks_per_bar))
+    
+    # The last bar is just a note_on/note_off per hit; the first bar is whatever precedes it
+    last_length = 2 * len(single_bar)
+    first_length = len(two) - last_length
+    middle_length = len(three) - len(two)
+    return only, two[:first_length], three[first_length:first_length + middle_length], two[first_length:]
+
+def _drum_messages(single_bar: np.ndarray, bars: int, ticks_per_bar: int) -> List[Message]:
+    """Write a single-bar pattern from _single_bar_events, repeated for bars, as note messages for the drum track"""
+    messages = []
+    for kind, note, velocity, time in _message_rows(single_bar, bars, ticks_per_bar).tolist():
+        # Copying a template and setting time skips Message's keyword validation
+        msg = _note_template(_MESSAGE_KINDS[kind], note, velocity).copy()
+        msg.time = time
+        messages.append(msg)
+    return messages
+
+# Message kinds used in the rows built by _message_rows
+_NOTE_ON, _NOTE_OFF = 0, 1
+_MESSAGE_KINDS = ('note_on', 'note_off')
+
+def _message_rows(single_bar: np.ndarray, bars: int, ticks_per_bar: int) -> np.ndarray:
+    """Expand a single-bar pattern into an (M, 4) array of [kind, note, velocity, delta time] message rows
+    
+    Notes are played one after another: each note_on waits from the end of the previous note
+    in its bar (tick + duration) to its own tick, and every bar but the last is padded with a
+    silent kick to reach the bar line. The first bar opens with a crash on the downbeat.
+    Every bar is written from the same pattern, so a fill running past the bar line stays
+    in its own bar rather than being moved into the next one.
+    """
+    if bars < 1:
+        return np.empty((0, 4), dtype=np.int64)
+    
+    ticks = single_bar[:, 0].astype(np.int64)
+    ends = ticks + single_bar[:, 3]
+    
+    # A note_on/note_off pair per hit; the note_off comes after the note's duration
+    note_rows = np.zeros((len(single_bar), 2, 4), dtype=np.int64)
+    note_rows[:, :, 0] = (_NOTE_ON, _NOTE_OFF)
+    note_rows[:, :, 1] = single_bar[:, 1:2]
+    note_rows[:, 0, 2] = single_bar[:, 2]
+    note_rows[:, 0, 3] = np.maximum(ticks - np.concatenate(([0], ends[:-1])), 0)
+    note_rows[:, 1, 3] = single_bar[:, 3]
+    note_rows = note_rows.reshape(-1, 4)
+    
+    # The first bar starts with a short crash, so its first note waits from the crash's end
+    crash_duration = 10  # Short so it doesn't delay other notes
+    crash_rows = np.array([[_NOTE_ON, DRUM_NOTES["crash"], VELOCITIES["accent"], 0],
+                           [_NOTE_OFF, DRUM_NOTES["crash"], 0, crash_duration]], dtype=np.int64)
+    first_rows = note_rows.copy()
+    if len(single_bar):
+        first_rows[0, 3] = max(ticks[0] - crash_duration, 0)
+    first_rows = np.concatenate((crash_rows, first_rows))
+    if bars == 1:
+        return first_rows
+    
+    def pad_rows(last_end: int) -> np.ndarray:
+        # Pad from the bar's final note end to the bar line, if it falls short of it
+        remaining = ticks_per_bar - last_end
+        if remaining <= 0:
+            return np.empty((0, 4), dtype=np.int64)
+        return np.array([[_NOTE_ON, DRUM_NOTES["kick"], 0, remaining],
+                         [_NOTE_OFF, DRUM_NOTES["kick"], 0, 0]], dtype=np.int64)
+    
+    last_end = int(ends[-1]) if len(single_bar) else 0
+    first_end = last_end if len(single_bar) else crash_duration
+    middle_rows = np.concatenate((note_rows, pad_rows(last_end)))
+    return np.concatenate((first_rows, pad_rows(first_end), np.tile(middle_rows, (bars - 2, 1)), note_rows))
+
+@lru_cache(maxsize=None)
+def _note_template(kind: str, note: int, velocity: int) -> Message:
+    """Return a shared drum-channel note message at time 0 to copy from; callers must not modify it"""
+    return Message(kind, note=note, velocity=velocity, channel=9)
+
+@lru_cache(maxsize=8)
+def _create_basic_pattern(ticks_per_bar: int) -> Tuple[Tuple[int, int, int, int], ...]:
+    """Create a basic rock/pop drum pattern
     
-    # Closed hi-hat on every sixteenth
-    for i in range(16):
-        pattern.append((i * sixteenth, DRUM_NOTES["closed_hihat"], 
-                        VELOCITIES["soft"] if i % 4 != 0 else VELOCITIES["normal"], 
-                        note_duration))
+    Returns a tuple of (tick, note, velocity, duration) tuples, shared between calls
+    """
+    # Pattern: kick, hihat, snare, hihat, hihat, kick, snare, hihat
+    rows = PATTERNS_44["basic"]
+    
+    # Add a soft hihat on every eighth note the main pattern leaves free
+    main_steps = 0
+    for _, _, mask in rows:
+        main_steps |= mask
+    hihat_row = ("closed_hihat", "soft", EIGHTH_NOTE_STEPS & ~main_steps)
     
-    # Sort by tick position and remove duplicates based on tick+note
-    unique_dict = {}
-    for item in pattern:
-        key = (item[0], item[1])  # tick, note
-        if key not in unique_dict or unique_dict[key][2] < item[2]:  # prefer higher velocity
-            unique_dict[key] = item
+    return _expand_step_rows(rows + (hihat_row,))
+
+@lru_cache(maxsize=8)
+def _create_four_on_floor_pattern(ticks_per_bar: int) -> Tuple[Tuple[int, int, int, int], ...]:
+    """Create a four-on-the-floor pattern (disco, house)
     
-    return sorted(unique_dict.values(), key=lambda x: x[0])
+    Returns a tuple of (tick, note, velocity, duration) tuples, shared between calls
+    """
+    # Kick on every beat, snare on 2 and 4, open hihat on offbeats, closed hihat on every sixteenth
+    return _expand_step_rows(PATTERNS_44["four_on_floor"])
 
-def _create_trap_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
+def _create_trap_pattern(ticks_per_bar: int, rng=random) -> List[Tuple[int, int, int, int]]:
     """Create a trap-style drum pattern with rolling hi-hats
     
     Returns a list of (tick, note, velocity, duration) tuples
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    sixteenth = quarter // 4
-    thirtysecond = sixteenth // 2
+    flips = _CoinFlips(rng)
     note_duration = 30  # Shorter duration for faster patterns
     
     pattern = []
     
     # Kick pattern (sparser, often syncopated)
-    kick_positions = [0, quarter + eighth, quarter * 2, quarter * 3 + eighth]
+    kick_positions = [0, _Q + _E, _Q * 2, _Q * 3 + _E]
     for pos in kick_positions:
         pattern.append((pos, DRUM_NOTES["kick"], VELOCITIES["accent"], note_duration))
     
     # Snare typically on beats 3 or 3+
-    snare_positions = [quarter * 2]
-    if random.random() > 0.5:  # Randomly add variation
-        snare_positions.append(quarter * 3 + eighth)
+    snare_positions = [_Q * 2]
+    if flips.chance(_P50):  # Randomly add variation
+        snare_positions.append(_Q * 3 + _E)
     for pos in snare_positions:
         pattern.append((pos, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
     
@@ -260,166 +402,114 @@ def _create_trap_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
     
     # Occasionally add clap layered with snare
     for pos in snare_positions:
-        if random.random() > 0.7:  # 30% chance
+        if flips.chance(_P30):  # 30% chance
             pattern.append((pos, DRUM_NOTES["clap"], VELOCITIES["normal"], note_duration))
     
     # Sort by tick position
-    return sorted(pattern, key=lambda x: x[0])
+    pattern.sort(key=itemgetter(0))
+    return pattern
 
-def _create_latin_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
+@lru_cache(maxsize=8)
+def _create_latin_pattern(ticks_per_bar: int) -> Tuple[Tuple[int, int, int, int], ...]:
     """Create a Latin percussion pattern
     
-    Returns a list of (tick, note, velocity, duration) tuples
+    Returns a tuple of (tick, note, velocity, duration) tuples, shared between calls
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    sixteenth = quarter // 4
-    note_duration = 40  # Short duration for percussion sounds
-    
-    pattern = []
-    
-    # Clave pattern (3-2 clave)
-    clave_positions = [0, quarter, quarter * 2, quarter * 2 + eighth, quarter * 3 + eighth]
-    for pos in clave_positions:
-        pattern.append((pos, DRUM_NOTES["clave"], VELOCITIES["accent"], note_duration))
-    
-    # Congas
-    conga_positions = [
-        (0, DRUM_NOTES["percussion_low"], VELOCITIES["accent"]),
-        (eighth, DRUM_NOTES["percussion_high"], VELOCITIES["normal"]),
-        (quarter, DRUM_NOTES["percussion_mid"], VELOCITIES["normal"]),
-        (quarter + eighth, DRUM_NOTES["percussion_high"], VELOCITIES["soft"]),
-        (quarter * 2, DRUM_NOTES["percussion_low"], VELOCITIES["accent"]),
-        (quarter * 2 + eighth, DRUM_NOTES["percussion_high"], VELOCITIES["normal"]),
-        (quarter * 3, DRUM_NOTES["percussion_mid"], VELOCITIES["normal"]),
-        (quarter * 3 + eighth, DRUM_NOTES["percussion_high"], VELOCITIES["soft"]),
-    ]
-    for pos, note, vel in conga_positions:
-        pattern.append((pos, note, vel, note_duration))
-    
-    # Shaker/Maracas on every eighth note
-    for i in range(8):
-        velocity = VELOCITIES["normal"] if i % 2 == 0 else VELOCITIES["soft"]
-        pattern.append((i * eighth, DRUM_NOTES["shaker"], velocity, note_duration))
-    
-    # Cowbell accents
-    cowbell_positions = [quarter, quarter * 3]
-    for pos in cowbell_positions:
-        pattern.append((pos, DRUM_NOTES["cowbell"], VELOCITIES["normal"], note_duration))
-    
-    # Basic kick and snare for foundation
-    kick_positions = [0, quarter * 2 + eighth]
-    snare_positions = [quarter, quarter * 3]
-    
-    for pos in kick_positions:
-        pattern.append((pos, DRUM_NOTES["kick"], VELOCITIES["normal"], note_duration))
-    
-    for pos in snare_positions:
-        pattern.append((pos, DRUM_NOTES["snare"], VELOCITIES["normal"], note_duration))
-    
-    # Sort by tick position
-    return sorted(pattern, key=lambda x: x[0])
+    # Clave, congas, shaker and cowbell over a basic kick and snare foundation
+    return _expand_step_rows(PATTERNS_44["latin"])
 
-def _create_pop_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
+def _create_pop_pattern(ticks_per_bar: int, rng=random) -> List[Tuple[int, int, int, int]]:
     """Create a contemporary pop drum pattern
     
     Returns a list of (tick, note, velocity, duration) tuples
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    sixteenth = quarter // 4
+    flips = _CoinFlips(rng)
     note_duration = 40  # Short duration for percussion sounds
     
     pattern = []
     
     # Standard kick pattern for pop
-    kick_positions = [0, quarter + eighth, quarter * 2 + eighth, quarter * 3 + (eighth if random.random() > 0.5 else 0)]
+    kick_positions = [0, _Q + _E, _Q * 2 + _E, _Q * 3 + (_E if flips.chance(_P50) else 0)]
     for pos in kick_positions:
         pattern.append((pos, DRUM_NOTES["kick"], VELOCITIES["accent"], note_duration))
     
     # Snare on beats 2 and 4
-    pattern.append((quarter, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
-    pattern.append((quarter * 3, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
+    pattern.append((_Q, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
+    pattern.append((_Q * 3, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
     
     # Clap layered with snare (common in pop)
-    pattern.append((quarter, DRUM_NOTES["clap"], VELOCITIES["normal"], note_duration))
-    pattern.append((quarter * 3, DRUM_NOTES["clap"], VELOCITIES["normal"], note_duration))
+    pattern.append((_Q, DRUM_NOTES["clap"], VELOCITIES["normal"], note_duration))
+    pattern.append((_Q * 3, DRUM_NOTES["clap"], VELOCITIES["normal"], note_duration))
     
     # Hi-hat pattern (usually eighth notes with occasional sixteenth notes)
     for i in range(8):
         velocity = VELOCITIES["normal"] if i % 2 == 0 else VELOCITIES["soft"]
-        pattern.append((i * eighth, DRUM_NOTES["closed_hihat"], velocity, note_duration))
+        pattern.append((i * _E, DRUM_NOTES["closed_hihat"], velocity, note_duration))
     
     # Add some sixteenth note hi-hat variations in the second half
-    if random.random() > 0.5:  # 50% chance for variation
+    if flips.chance(_P50):  # 50% chance for variation
         for i in range(8, 16):
-            if random.random() > 0.7:  # 30% chance per position
-                pattern.append((i * sixteenth, DRUM_NOTES["closed_hihat"], VELOCITIES["soft"], note_duration))
+            if flips.chance(_P30):  # 30% chance per position
+                pattern.append((i * _S, DRUM_NOTES["closed_hihat"], VELOCITIES["soft"], note_duration))
     
     # Tambourine on offbeats (common in pop)
     for i in range(4):
-        pattern.append((i * quarter + eighth, DRUM_NOTES["tambourine"], VELOCITIES["soft"], note_duration))
+        pattern.append((i * _Q + _E, DRUM_NOTES["tambourine"], VELOCITIES["soft"], note_duration))
     
     # Sort by tick position
-    return sorted(pattern, key=lambda x: x[0])
+    pattern.sort(key=itemgetter(0))
+    return pattern
 
-def _create_rock_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
+def _create_rock_pattern(ticks_per_bar: int, rng=random) -> List[Tuple[int, int, int, int]]:
     """Create a rock drum pattern
     
     Returns a list of (tick, note, velocity, duration) tuples
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    sixteenth = quarter // 4
+    flips = _CoinFlips(rng)
     note_duration = 40  # Short duration for percussion sounds
     
     pattern = []
     
     # Standard rock kick pattern
-    kick_positions = [0, quarter * 2, quarter * 2 + eighth + sixteenth, quarter * 3 + eighth]
+    kick_positions = [0, _Q * 2, _Q * 2 + _E + _S, _Q * 3 + _E]
     for pos in kick_positions:
         pattern.append((pos, DRUM_NOTES["kick"], VELOCITIES["accent"], note_duration))
     
     # Snare on beats 2 and 4
-    pattern.append((quarter, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
-    pattern.append((quarter * 3, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
+    pattern.append((_Q, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
+    pattern.append((_Q * 3, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
     
     # Ride cymbal or hi-hat pattern (usually eighth notes)
-    cymbal = DRUM_NOTES["closed_hihat"] if random.random() > 0.5 else DRUM_NOTES["ride"]
+    cymbal = DRUM_NOTES["closed_hihat"] if flips.chance(_P50) else DRUM_NOTES["ride"]
     for i in range(8):
         # Accent on the beats
         velocity = VELOCITIES["accent"] if i % 2 == 0 else VELOCITIES["normal"]
-        pattern.append((i * eighth, cymbal, velocity, note_duration))
+        pattern.append((i * _E, cymbal, velocity, note_duration))
     
     # Add occasional crash cymbal
-    if random.random() > 0.7:  # 30% chance
-        crash_pos = quarter * 2 if random.random() > 0.5 else 0
+    if flips.chance(_P30):  # 30% chance
+        crash_pos = _Q * 2 if flips.chance(_P50) else 0
         pattern.append((crash_pos, DRUM_NOTES["crash"], VELOCITIES["accent"], note_duration))
     
     # Add tom fills at the end of the bar
-    if random.random() > 0.7:  # 30% chance for a fill
+    if flips.chance(_P30):  # 30% chance for a fill
         toms = [DRUM_NOTES["tom_high"], DRUM_NOTES["tom_mid"], DRUM_NOTES["tom_low"]]
-        start_pos = quarter * 3 + eighth
+        start_pos = _Q * 3 + _E
         for i in range(3):
             tom = toms[i % len(toms)]
-            pos = start_pos + (i * sixteenth)
+            pos = start_pos + (i * _S)
             pattern.append((pos, tom, VELOCITIES["accent"], note_duration))
     
     # Sort by tick position
-    return sorted(pattern, key=lambda x: x[0])
+    pattern.sort(key=itemgetter(0))
+    return pattern
 
-def _create_jazz_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
+def _create_jazz_pattern(ticks_per_bar: int, rng=random) -> List[Tuple[int, int, int, int]]:
     """Create a jazz swing pattern
     
     Returns a list of (tick, note, velocity, duration) tuples
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    triplet = quarter // 3  # Triplet feel is characteristic of swing
+    flips = _CoinFlips(rng)
     note_duration = 40  # Short duration for percussion sounds
     
     pattern = []
@@ -427,27 +517,27 @@ def _create_jazz_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
     # Ride cymbal pattern with swing feel
     for beat in range(4):
         # Beat
-        pattern.append((beat * quarter, DRUM_NOTES["ride"], VELOCITIES["accent"], note_duration))
+        pattern.append((beat * _Q, DRUM_NOTES["ride"], VELOCITIES["accent"], note_duration))
         # And (swung)
-        pattern.append((beat * quarter + triplet * 2, DRUM_NOTES["ride"], VELOCITIES["normal"], note_duration))
+        pattern.append((beat * _Q + _TR * 2, DRUM_NOTES["ride"], VELOCITIES["normal"], note_duration))
     
     # Add occasional ride bell
-    if random.random() > 0.7:
-        bell_positions = [quarter, quarter * 3]
+    if flips.chance(_P30):
+        bell_positions = [_Q, _Q * 3]
         for pos in bell_positions:
-            if random.random() > 0.5:
+            if flips.chance(_P50):
                 pattern.append((pos, DRUM_NOTES["ride_bell"], VELOCITIES["accent"], note_duration))
     
     # Hi-hat with foot on beats 2 and 4 (characteristic of jazz)
-    pattern.append((quarter, DRUM_NOTES["pedal_hihat"], VELOCITIES["normal"], note_duration))
-    pattern.append((quarter * 3, DRUM_NOTES["pedal_hihat"], VELOCITIES["normal"], note_duration))
+    pattern.append((_Q, DRUM_NOTES["pedal_hihat"], VELOCITIES["normal"], note_duration))
+    pattern.append((_Q * 3, DRUM_NOTES["pedal_hihat"], VELOCITIES["normal"], note_duration))
     
     # Kick drum sparse and often syncopated in jazz
     kick_positions = []
-    if random.random() > 0.5:
+    if flips.chance(_P50):
         kick_positions.append(0)  # Sometimes on beat 1
-    if random.random() > 0.7:
-        kick_positions.append(quarter * 2 + triplet)  # Sometimes on a syncopated beat
+    if flips.chance(_P30):
+        kick_positions.append(_Q * 2 + _TR)  # Sometimes on a syncopated beat
     
     for pos in kick_positions:
         pattern.append((pos, DRUM_NOTES["kick"], VELOCITIES["normal"], note_duration))
@@ -455,164 +545,158 @@ def _create_jazz_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
     # Snare comping - varied and improvisational
     # In real jazz, this would be more varied, but we'll use some common patterns
     snare_options = [
-        [quarter + triplet, quarter * 3 + triplet],
-        [quarter * 2, quarter * 3 + triplet * 2],
-        [quarter + triplet * 2, quarter * 2 + triplet, quarter * 3 + triplet * 2]
+        [_Q + _TR, _Q * 3 + _TR],
+        [_Q * 2, _Q * 3 + _TR * 2],
+        [_Q + _TR * 2, _Q * 2 + _TR, _Q * 3 + _TR * 2]
     ]
     
-    snare_pattern = random.choice(snare_options)
+    snare_pattern = flips.choice(snare_options)
     for pos in snare_pattern:
         # Vary the velocity for more natural comping
-        vel = random.choice([VELOCITIES["ghost"], VELOCITIES["normal"], VELOCITIES["accent"]])
+        vel = flips.choice([VELOCITIES["ghost"], VELOCITIES["normal"], VELOCITIES["accent"]])
         pattern.append((pos, DRUM_NOTES["snare"], vel, note_duration))
     
     # Sort by tick position
-    return sorted(pattern, key=lambda x: x[0])
+    pattern.sort(key=itemgetter(0))
+    return pattern
 
-def _create_electronic_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
+def _create_electronic_pattern(ticks_per_bar: int, rng=random) -> List[Tuple[int, int, int, int]]:
     """Create an electronic/EDM pattern
     
     Returns a list of (tick, note, velocity, duration) tuples
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    sixteenth = quarter // 4
+    flips = _CoinFlips(rng)
     note_duration = 30  # Shorter for electronic music
     
     pattern = []
     
     # Four-on-the-floor kick pattern (standard in EDM)
     for beat in range(4):
-        pattern.append((beat * quarter, DRUM_NOTES["kick"], VELOCITIES["accent"], note_duration))
+        pattern.append((beat * _Q, DRUM_NOTES["kick"], VELOCITIES["accent"], note_duration))
     
     # Clap or snare on beats 2 and 4
-    percussion = DRUM_NOTES["clap"] if random.random() > 0.5 else DRUM_NOTES["snare"]
-    pattern.append((quarter, percussion, VELOCITIES["normal"], note_duration))
-    pattern.append((quarter * 3, percussion, VELOCITIES["normal"], note_duration))
+    percussion = DRUM_NOTES["clap"] if flips.chance(_P50) else DRUM_NOTES["snare"]
+    pattern.append((_Q, percussion, VELOCITIES["normal"], note_duration))
+    pattern.append((_Q * 3, percussion, VELOCITIES["normal"], note_duration))
     
     # Hi-hat pattern - either steady sixteenths or eighth notes
-    if random.random() > 0.5:
+    if flips.chance(_P50):
         # Sixteenth notes
         for i in range(16):
             velocity = VELOCITIES["accent"] if i % 4 == 0 else VELOCITIES["soft"]
-            pattern.append((i * sixteenth, DRUM_NOTES["closed_hihat"], velocity, note_duration))
+            pattern.append((i * _S, DRUM_NOTES["closed_hihat"], velocity, note_duration))
     else:
         # Eighth notes, alternating closed and open
         for i in range(8):
             hat_type = DRUM_NOTES["closed_hihat"] if i % 2 == 0 else DRUM_NOTES["open_hihat"]
-            pattern.append((i * eighth, hat_type, VELOCITIES["normal"], note_duration))
+            pattern.append((i * _E, hat_type, VELOCITIES["normal"], note_duration))
     
     # Add occasional electronic effects (using tom sounds as substitutes)
-    if random.random() > 0.5:
+    if flips.chance(_P50):
         effect_positions = [
-            (quarter + eighth + sixteenth, DRUM_NOTES["tom_high"]),
-            (quarter * 3 + eighth, DRUM_NOTES["tom_mid"])
+            (_Q + _E + _S, DRUM_NOTES["tom_high"]),
+            (_Q * 3 + _E, DRUM_NOTES["tom_mid"])
         ]
         for pos, note in effect_positions:
-            if random.random() > 0.5:
+            if flips.chance(_P50):
                 pattern.append((pos, note, VELOCITIES["soft"], note_duration))
     
     # Rhythmic variation in the last beat
-    if random.random() > 0.7:
+    if flips.chance(_P30):
         for i in range(3):
-            pos = quarter * 3 + (i + 1) * sixteenth
+            pos = _Q * 3 + (i + 1) * _S
             pattern.append((pos, DRUM_NOTES["kick_alt"], VELOCITIES["normal"], note_duration))
     
     # Sort by tick position
-    return sorted(pattern, key=lambda x: x[0])
+    pattern.sort(key=itemgetter(0))
+    return pattern
 
-def _create_hip_hop_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
+def _create_hip_hop_pattern(ticks_per_bar: int, rng=random) -> List[Tuple[int, int, int, int]]:
     """Create a hip-hop beat pattern
     
     Returns a list of (tick, note, velocity, duration) tuples
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    sixteenth = quarter // 4
+    flips = _CoinFlips(rng)
     note_duration = 40  # Short duration for percussion sounds
     
     pattern = []
     
     # Hip-hop often uses syncopated kick patterns
     kick_options = [
-        [0, quarter + eighth, quarter * 2, quarter * 3 + eighth],  # Classic boom-bap
-        [0, quarter * 2, quarter * 2 + eighth + sixteenth, quarter * 3 + eighth],  # Syncopated
-        [0, quarter + eighth, quarter * 2 + eighth, quarter * 3 + eighth]  # All offbeats except first
+        [0, _Q + _E, _Q * 2, _Q * 3 + _E],  # Classic boom-bap
+        [0, _Q * 2, _Q * 2 + _E + _S, _Q * 3 + _E],  # Syncopated
+        [0, _Q + _E, _Q * 2 + _E, _Q * 3 + _E]  # All offbeats except first
     ]
-    kick_pattern = random.choice(kick_options)
+    kick_pattern = flips.choice(kick_options)
     
     for pos in kick_pattern:
         pattern.append((pos, DRUM_NOTES["kick"], VELOCITIES["accent"], note_duration))
     
     # Snare on beats 2 and 4 (classic hip-hop)
-    pattern.append((quarter, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
-    pattern.append((quarter * 3, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
+    pattern.append((_Q, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
+    pattern.append((_Q * 3, DRUM_NOTES["snare"], VELOCITIES["accent"], note_duration))
     
     # Layered clap is common
-    pattern.append((quarter, DRUM_NOTES["clap"], VELOCITIES["normal"], note_duration))
-    pattern.append((quarter * 3, DRUM_NOTES["clap"], VELOCITIES["normal"], note_duration))
+    pattern.append((_Q, DRUM_NOTES["clap"], VELOCITIES["normal"], note_duration))
+    pattern.append((_Q * 3, DRUM_NOTES["clap"], VELOCITIES["normal"], note_duration))
     
     # Hi-hat pattern - often eighth notes with some variations
-    hat_positions = [i * eighth for i in range(8)]
+    hat_positions = [i * _E for i in range(8)]
     for pos in hat_positions:
         # Vary the velocities to create a groove
-        vel = VELOCITIES["normal"] if pos % quarter == 0 else VELOCITIES["soft"]
+        vel = VELOCITIES["normal"] if pos % _Q == 0 else VELOCITIES["soft"]
         pattern.append((pos, DRUM_NOTES["closed_hihat"], vel, note_duration))
     
     # Add some ghost notes for realism
-    ghost_positions = [quarter + sixteenth, quarter * 3 + sixteenth]
+    ghost_positions = [_Q + _S, _Q * 3 + _S]
     for pos in ghost_positions:
-        if random.random() > 0.7:  # 30% chance
+        if flips.chance(_P30):  # 30% chance
             pattern.append((pos, DRUM_NOTES["snare"], VELOCITIES["ghost"], note_duration))
     
     # Occasionally add percussive elements
     perc_options = [DRUM_NOTES["tambourine"], DRUM_NOTES["cowbell"], DRUM_NOTES["clave"]]
-    perc_element = random.choice(perc_options)
-    perc_positions = [quarter + eighth, quarter * 3 + eighth]
+    perc_element = flips.choice(perc_options)
+    perc_positions = [_Q + _E, _Q * 3 + _E]
     
     for pos in perc_positions:
-        if random.random() > 0.6:  # 40% chance
+        if flips.chance(_P40):  # 40% chance
             pattern.append((pos, perc_element, VELOCITIES["soft"], note_duration))
     
     # Sort by tick position
-    return sorted(pattern, key=lambda x: x[0])
+    pattern.sort(key=itemgetter(0))
+    return pattern
 
-def _create_rnb_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
+def _create_rnb_pattern(ticks_per_bar: int, rng=random) -> List[Tuple[int, int, int, int]]:
     """Create an R&B groove pattern
     
     Returns a list of (tick, note, velocity, duration) tuples
     """
-    # Define time values (in ticks)
-    quarter = TICKS_PER_BEAT
-    eighth = quarter // 2
-    sixteenth = quarter // 4
+    flips = _CoinFlips(rng)
     note_duration = 40  # Short duration for percussion sounds
     
     pattern = []
     
     # R&B kick patterns - often with more subtle syncopation
-    kick_pattern = [0, quarter * 2]
+    kick_pattern = [0, _Q * 2]
     # Add some variations
-    if random.random() > 0.5:
-        kick_pattern.append(quarter + eighth)
-    if random.random() > 0.5:
-        kick_pattern.append(quarter * 3 + eighth)
+    if flips.chance(_P50):
+        kick_pattern.append(_Q + _E)
+    if flips.chance(_P50):
+        kick_pattern.append(_Q * 3 + _E)
     
     for pos in kick_pattern:
         pattern.append((pos, DRUM_NOTES["kick"], VELOCITIES["normal"], note_duration))
     
     # Snare on beats 2 and 4 with rimshots for variation
-    if random.random() > 0.5:
-        pattern.append((quarter, DRUM_NOTES["snare"], VELOCITIES["normal"], note_duration))
+    if flips.chance(_P50):
+        pattern.append((_Q, DRUM_NOTES["snare"], VELOCITIES["normal"], note_duration))
     else:
-        pattern.append((quarter, DRUM_NOTES["snare_rim"], VELOCITIES["normal"], note_duration))
+        pattern.append((_Q, DRUM_NOTES["snare_rim"], VELOCITIES["normal"], note_duration))
         
-    if random.random() > 0.5:
-        pattern.append((quarter * 3, DRUM_NOTES["snare"], VELOCITIES["normal"], note_duration))
+    if flips.chance(_P50):
+        pattern.append((_Q * 3, DRUM_NOTES["snare"], VELOCITIES["normal"], note_duration))
     else:
-        pattern.append((quarter * 3, DRUM_NOTES["snare_rim"], VELOCITIES["normal"], note_duration))
+        pattern.append((_Q * 3, DRUM_NOTES["snare_rim"], VELOCITIES["normal"], note_duration))
     
     # R&B often uses sixteenth note hi-hat patterns
     for i in range(16):
@@ -627,22 +711,40 @@ def _create_rnb_pattern(ticks_per_bar: int) -> List[Tuple[int, int, int, int]]:
             
         hat_type = DRUM_NOTES["closed_hihat"]
         # Occasionally open hi-hat for variation
-        if (i == 7 or i == 15) and random.random() > 0.5:
+        if (i == 7 or i == 15) and flips.chance(_P50):
             hat_type = DRUM_NOTES["open_hihat"]
             
-        pattern.append((i * sixteenth, hat_type, velocity, note_duration))
+        pattern.append((i * _S, hat_type, velocity, note_duration))
     
     # Add ghost notes for snare (common in R&B)
-    ghost_positions = [sixteenth, quarter + sixteenth, quarter * 2 + sixteenth, quarter * 3 + sixteenth]
+    ghost_positions = [_S, _Q + _S, _Q * 2 + _S, _Q * 3 + _S]
     for pos in ghost_positions:
-        if random.random() > 0.6:  # 40% chance
+        if flips.chance(_P40):  # 40% chance
             pattern.append((pos, DRUM_NOTES["snare"], VELOCITIES["ghost"], note_duration))
     
     # Add rim clicks or percussion elements
-    if random.random() > 0.5:
+    if flips.chance(_P50):
         for i in range(2):
-            pos = (i * 2 + 1) * quarter + eighth  # Offbeats of 2 and 4
+            pos = (i * 2 + 1) * _Q + _E  # Offbeats of 2 and 4
             pattern.append((pos, DRUM_NOTES["snare_rim"], VELOCITIES["soft"], note_duration))
     
     # Sort by tick position
-    return sorted(pattern, key=lambda x: x[0])
\ No newline at end of file
+    pattern.sort(key=itemgetter(0))
+    return pattern
+
+# Pattern builders by style name
+_PATTERN_FUNCTIONS = {
+    "basic": _create_basic_pattern,
+    "four_on_floor": _create_four_on_floor_pattern,
+    "trap": _create_trap_pattern,
+    "latin": _create_latin_pattern,
+    "pop": _create_pop_pattern,
+    "rock": _create_rock_pattern,
+    "jazz": _create_jazz_pattern,
+    "electronic": _create_electronic_pattern,
+    "hip_hop": _create_hip_hop_pattern,
+    "r_and_b": _create_rnb_pattern,
+}
+
+# Styles built purely from step masks, with no random variation
+_DETERMINISTIC_STYLES = frozenset(PATTERNS_44)
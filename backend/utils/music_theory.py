@@ -2,39 +2,98 @@
 Music theory helper functions
 """
 
+import re
+from functools import lru_cache
+
+# Punctuation to strip before splitting lyrics into words (apostrophes are kept)
+_PUNCT_RE = re.compile(r"[^\w\s']")
+
+# The ASCII characters _PUNCT_RE removes, so ASCII lyrics can be stripped with bytes.translate
+_PUNCT_BYTES = bytes(i for i in range(128) if _PUNCT_RE.match(chr(i)))
+
+_VOWELS = frozenset("aeiouy")
+
+# Byte table mapping ASCII vowels of either case to b'v' and everything else to a space,
+# so the vowel groups of an ASCII word are the words of its translation
+_VOWEL_RUNS_TABLE = bytes(ord('v') if chr(i) in "aeiouyAEIOUY" else ord(' ') for i in range(256))
+
+_VOWEL_CODES = [ord(c) for c in "aeiouy"]
+
+# Texts at least this long count vowel groups in one NumPy pass; shorter ones are faster in plain Python
+_VECTORIZE_MIN_CHARS = 2048
+
+# Lyrics repeat the same words heavily, so per-word counts are cached
+@lru_cache(maxsize=4096)
+def _count_vowel_groups(word):
+    """Count the vowel sequences in a single word"""
+    if word.isascii():
+        # The table covers both cases, so ASCII words skip lowercasing and the per-character loop
+        return len(word.encode('ascii').translate(_VOWEL_RUNS_TABLE).split())
+
+    # Lowercasing can turn a non-ASCII letter into a vowel (e.g. 'İ' -> 'i̇'), so check it per character
+    count = 0
+    in_vowel_group = False
+
+    for char in word.lower():
+        if char in _VOWELS:
+            if not in_vowel_group:
+                count += 1
+                in_vowel_group = True
+        else:
+            in_vowel_group = False
+
+    return count
+
+def _vowel_group_counts(words):
+    """Count the vowel sequences in each word with a single pass over all of them"""
+    # Imported here so importing this module doesn't load NumPy for short lyrics
+    import numpy as np
+    
+    # UTF-32 gives one array element per character, so non-ASCII letters still split vowel groups
+    codes = np.frombuffer(" ".join(words).lower().encode('utf-32-le'), dtype=np.uint32)
+    is_vowel = np.isin(codes, _VOWEL_CODES)
+
+    # A group starts at a vowel that doesn't follow another; the separating spaces keep groups within words
+    group_starts = is_vowel.copy()
+    group_starts[1:] &= ~is_vowel[:-1]
+    word_index = np.cumsum(codes == ord(' '))
+    return np.bincount(word_index[group_starts], minlength=len(words)).tolist()
+
 def syllabify(text):
     """Simple syllable counter - splits text into approximate syllables"""
     if not text:
         return []
-        
+
     # Remove punctuation except apostrophes
-    import re
-    text = re.sub(r'[^\w\s\']', '', text)
-    
+    if text.isascii():
+        text = text.encode('ascii').translate(None, _PUNCT_BYTES).decode('ascii')
+    else:
+        text = _PUNCT_RE.sub('', text)
+
     # Split into words
     words = text.split()
-    
+
+    # Count vowel sequences as syllables
+    if len(text) >= _VECTORIZE_MIN_CHARS:
+        counts = _vowel_group_counts(words)
+    else:
+        counts = [_count_vowel_groups(word) for word in words]
+
     syllables = []
-    for word in words:
-        # Count vowel sequences as syllables
-        vowels = "aeiouy"
-        count = 0
-        in_vowel_group = False
-        
-        for char in word.lower():
-            if char in vowels:
-                if not in_vowel_group:
-                    count += 1
-                    in_vowel_group = True
-            else:
-                in_vowel_group = False
-        
-        # Ensure at least one syllable per word
-        if count == 0:
-            count = 1
-            
-        # Add each syllable to the list
-        for i in range(count):
-            syllables.append(word if count == 1 else f"{word}_{i+1}")
-    
-    return syllables
\ No newline at end of file
+    # Repeated words reuse the strings built for their first occurrence
+    seen_words = {}
+    split_words = {}
+    for word, count in zip(words, counts):
+        # Ensure at least one syllable per word, which keeps the word as is
+        if count <= 1:
+            syllables.append(seen_words.setdefault(word, word))
+        else:
+            parts = split_words.get(word)
+            if parts is None:
+                parts = split_words[word] = []
+                for i in range(1, count + 1):
+                    parts.append(f"{word}_{i}")
+            # Add each syllable to the list
+            syllables += parts
+
+    return syllables
@@ -0,0 +1,16 @@
+"""
+Song file naming shared by the MIDI writer and the song service
+"""
+
+import string
+from functools import lru_cache
+
+# ASCII bytes dropped when turning a song title into its folder name (non-ASCII is dropped by the encode)
+_KEEP_BYTES = (string.ascii_letters + string.digits + ' ').encode('ascii')
+_DELETE_BYTES = bytes(b for b in range(128) if b not in _KEEP_BYTES)
+
+@lru_cache(maxsize=2048)
+def safe_folder_name(song_title: str) -> str:
+    """Return the folder (and MIDI file) name a song title is stored under"""
+    safe = song_title.encode('ascii', 'ignore').translate(None, _DELETE_BYTES).decode('ascii')
+    return safe.rstrip().replace(' ', '_') or 'song'